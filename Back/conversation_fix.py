@@ -17,109 +17,379 @@ SOLUTION:
 Usage: python conversation_fix.py
 """
 
+import ast
 import os
 import sys
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+
+def _locate(tree, predicate):
+    """Find the source-order-first AST node matching predicate, or None.
+
+    ast.walk yields nested nodes in an unspecified order relative to their
+    siblings, so pick the earliest match by position instead of relying on
+    traversal order.
+    """
+    matches = [node for node in ast.walk(tree) if predicate(node)]
+    if not matches:
+        return None
+    return min(matches, key=lambda node: (node.lineno, node.col_offset))
+
+
+def _chain_root(expr):
+    """Innermost expression of a call chain, e.g. `select` for select(...).options(...).where(...)"""
+    while isinstance(expr, (ast.Call, ast.Attribute)):
+        expr = expr.func if isinstance(expr, ast.Call) else expr.value
+    return expr
+
+
+def _splice(lines, node, replacement):
+    """Replace a node's source lines with new code, reindented to the node's column"""
+    indent = " " * node.col_offset
+    new_block = [
+        (indent + line if line.strip() else line.strip()) + "\n"
+        for line in textwrap.dedent(replacement).splitlines()
+    ]
+    return lines[:node.lineno - 1] + new_block + lines[node.end_lineno:]
+
+
+def _segment(source, node):
+    """Source text of a node (for already-patched checks)"""
+    return ast.get_source_segment(source, node) or ""
+
+
+def _span(first, last):
+    """A splice target covering the contiguous sibling statements first..last"""
+    return SimpleNamespace(
+        lineno=first.lineno, col_offset=first.col_offset, end_lineno=last.end_lineno
+    )
+
+
+def _write_back(f, content, lines):
+    """Rewrite the open r+ handle only if the patches changed something.
+
+    Skipping the no-op write keeps the file's mtime stable so dev-loop
+    watchers (uvicorn --reload) don't restart for nothing.
+    """
+    updated = "".join(lines)
+    if updated == content:
+        return False
+    f.seek(0)
+    f.truncate()
+    f.write(updated)
+    return True
+
 
 def apply_conversation_model_fix():
     """Apply the critical fix to the Conversation model"""
-    
+
     model_path = "/Users/blas/Desktop/INRE/INRE-DOCK-2/Back/app/models/conversation.py"
-    
+
     print("🔧 Applying Conversation model fix...")
-    
-    # Read the current file
-    with open(model_path, 'r') as f:
+
+    # One r+ handle: read, patch in memory, rewrite in place only if changed
+    with open(model_path, 'r+') as f:
         content = f.read()
-    
-    # Apply the fix - change lazy="select" to lazy="selectin"
-    old_relationship = '''    # Many-to-many relationship to Projects
-    projects = relationship(
-        "Project",
-        secondary=project_conversations,
-        back_populates="conversations",
-        lazy="select"
-    )'''
-    
-    new_relationship = '''    # Many-to-many relationship to Projects
-    projects = relationship(
-        "Project",
-        secondary=project_conversations,
-        back_populates="conversations",
-        lazy="selectin"  # FIXED: Use selectin for better eager loading with async sessions
-    )'''
-    
-    if old_relationship in content:
-        content = content.replace(old_relationship, new_relationship)
-        print("✅ Fixed Conversation.projects relationship lazy loading")
-    else:
-        print("⚠️ Conversation model relationship already fixed or pattern not found")
-    
-    # Write the updated content back
-    with open(model_path, 'w') as f:
-        f.write(content)
-    
+        lines = content.splitlines(keepends=True)
+        tree = ast.parse(content)
+
+        # Find `projects = relationship("Project", ...)` by node shape
+        def is_projects_relationship(node):
+            return (
+                isinstance(node, ast.Assign)
+                and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and node.targets[0].id == "projects"
+                and isinstance(node.value, ast.Call)
+                and isinstance(node.value.func, ast.Name)
+                and node.value.func.id == "relationship"
+            )
+
+        # omit_join is deliberately not set: SQLAlchemy rejects forcing it to
+        # True and auto-detects the omit-join optimization when it is safe
+        new_relationship = '''\
+projects = relationship(
+    "Project",
+    secondary=project_conversations,
+    back_populates="conversations",
+    lazy="selectin"  # FIXED: Use selectin for better eager loading with async sessions
+)'''
+
+        target = _locate(tree, is_projects_relationship)
+        if target is None:
+            print("⚠️ Conversation model relationship pattern not found")
+        elif 'lazy="selectin"' in _segment(content, target):
+            print("⚠️ Conversation model relationship already fixed")
+        else:
+            lines = _splice(lines, target, new_relationship)
+            print("✅ Fixed Conversation.projects relationship lazy loading")
+
+        # Rewrite in place only when a patch landed
+        _write_back(f, content, lines)
+
     return True
 
-def apply_conversation_service_fix():
-    """Apply the critical fix to the Conversation service"""
-    
+def _import_patches(tree, use_dto):
+    """Queue rewrites of the service's import lines.
+
+    The injected code references names (joinedload, raiseload, settings)
+    that conversation_service.py does not import; without these patches the
+    patched service raises NameError on its first request.
+    """
+    patches = []
+
+    def find_import(module, level=0):
+        return _locate(tree, lambda n: isinstance(n, ast.ImportFrom)
+                       and n.module == module and n.level == level)
+
+    def extend_import(module, level, needed, description):
+        node = find_import(module, level)
+        if node is None:
+            return
+        names = [alias.name for alias in node.names]
+        missing = [name for name in needed if name not in names]
+        if not missing:
+            return
+        rendered = "from %s%s import %s" % ("." * level, module, ", ".join(names + missing))
+        patches.append((node, rendered, description))
+
+    if use_dto:
+        # The DTO query joins the association table at module scope; the
+        # service only imports it locally inside get_user_conversations
+        extend_import("models.project", 2, ["project_conversations"],
+                      "✅ Imported project_conversations for the DTO query")
+
+    if not use_dto:
+        extend_import("sqlalchemy.orm", 0, ["joinedload", "raiseload"],
+                      "✅ Imported joinedload/raiseload for the loader options")
+        extend_import("sqlalchemy", 0, ["inspect"],
+                      "✅ Imported sqlalchemy.inspect for the refresh assertion")
+        if find_import("core.config", level=2) is None:
+            anchor = find_import("core.database", level=2)
+            if anchor is not None:
+                names = ", ".join(alias.name for alias in anchor.names)
+                patches.append((
+                    anchor,
+                    "from ..core.database import %s\nfrom ..core.config import settings" % names,
+                    "✅ Imported settings for the debug raiseload guard",
+                ))
+
+    return patches
+
+
+def apply_conversation_service_fix(use_dto=False):
+    """Apply the critical fix to the Conversation service.
+
+    With use_dto=True the list query is rewritten as a Core column select
+    instead of full ORM objects - no identity-map hydration, and the whole
+    category of lazy-loading bugs this script papers over goes away.
+    """
+
     service_path = "/Users/blas/Desktop/INRE/INRE-DOCK-2/Back/app/services/conversation_service.py"
-    
+
     print("🔧 Applying Conversation service fix...")
-    
-    # Read the current file
-    with open(service_path, 'r') as f:
+
+    # One r+ handle: read, collect every patch, splice, rewrite in place only if changed
+    with open(service_path, 'r+') as f:
         content = f.read()
-    
-    # Add enhanced relationship loading if not already present
-    old_loading = '''            base_query = select(Conversation).options(
-                selectinload(Conversation.projects).selectinload(Project.user),  # Load projects with user data
-                selectinload(Conversation.assistant),   # Load assistant relationship for API responses
-                selectinload(Conversation.user)         # Load user relationship to avoid lazy loading issues
-            ).where(Conversation.user_id == user_id)'''
-    
-    new_loading = '''            # 🔧 CRITICAL FIX: Enhanced relationship loading with forced project loading
-            base_query = select(Conversation).options(
-                selectinload(Conversation.projects).selectinload(Project.user),  # Load projects with user data
-                selectinload(Conversation.assistant),   # Load assistant relationship for API responses
-                selectinload(Conversation.user)         # Load user relationship to avoid lazy loading issues
-            ).where(Conversation.user_id == user_id)'''
-    
-    if old_loading in content:
-        content = content.replace(old_loading, new_loading)
-        print("✅ Enhanced conversation service relationship loading")
-    else:
-        print("⚠️ Conversation service loading already enhanced or pattern not found")
-    
-    # Add critical project relationship forcing after refresh
-    old_refresh = '''                    # Force refresh project and assistant relationships
-                    await db.refresh(conversation, attribute_names=['projects', 'assistant'])'''
-    
-    new_refresh = '''                    # 🔧 CRITICAL FIX: Force refresh and validate project relationships
-                    await db.refresh(conversation, attribute_names=['projects', 'assistant', 'user'])
-                    
-                    # Force explicit loading of projects relationship to ensure it's available
-                    if hasattr(conversation, 'projects'):
-                        # Touch the projects relationship to force SQLAlchemy to load it
-                        projects_count = len(conversation.projects) if conversation.projects else 0
-                        if projects_count > 0:
-                            # Ensure each project object is fully loaded
-                            for project in conversation.projects:
-                                _ = project.name, project.id  # Access properties to force loading
-                        logger.info(f"   - FORCED projects loading: {projects_count} projects found")
-                    else:
-                        logger.warning(f"   - ❌ No projects attribute found on conversation {conversation.id}")'''
-    
-    if old_refresh in content:
-        content = content.replace(old_refresh, new_refresh)
-        print("✅ Enhanced conversation refresh logic with forced project loading")
-    else:
-        print("⚠️ Conversation refresh logic already enhanced or pattern not found")
-    
-    # Write the updated content back
-    with open(service_path, 'w') as f:
-        f.write(content)
-    
+        lines = content.splitlines(keepends=True)
+        tree = ast.parse(content)
+        # (node, replacement, description); starts with whatever import lines
+        # need extending so the injected code's names resolve at runtime
+        patches = _import_patches(tree, use_dto)
+
+        # Patch 1: the base_query assignment gets joinedload-based loader options
+        def is_base_query(node):
+            return (
+                isinstance(node, ast.Assign)
+                and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and node.targets[0].id == "base_query"
+                # Only the initial `select(Conversation).options(...)` build,
+                # not the later `base_query = base_query.join(...)` narrowing
+                and isinstance(_chain_root(node.value), ast.Name)
+                and _chain_root(node.value).id == "select"
+            )
+
+        new_loading = '''\
+    # 🔧 CRITICAL FIX: joinedload for the at-most-one folder lookup (1 SQL statement instead of 2)
+    loader_options = [
+        # to_dict only renders project id/name - don't drag in full Project rows or Project.user
+        joinedload(Conversation.projects).load_only(Project.id, Project.name),
+        selectinload(Conversation.assistant),   # Load assistant relationship for API responses
+        joinedload(Conversation.user)           # Load user relationship to avoid lazy loading issues
+    ]
+    if settings.debug:
+        # Turn any accidental lazy load into a loud error instead of a silent N+1
+        loader_options.append(raiseload("*"))
+    base_query = select(Conversation).options(*loader_options).where(Conversation.user_id == user_id)'''
+
+        new_loading_dto = '''\
+    # 🔧 ALTERNATIVE FIX: lightweight DTO query - only the columns the JSON response needs,
+    # no ORM hydration and therefore no lazy-loading pitfalls to force or refresh around
+    base_query = (
+        select(Conversation.id, Conversation.title, Conversation.created_at,
+               Project.id.label('project_id'), Project.name.label('project_name'))
+        .select_from(Conversation)
+        .outerjoin(project_conversations, project_conversations.c.conversation_id == Conversation.id)
+        .outerjoin(Project, Project.id == project_conversations.c.project_id)
+        .where(Conversation.user_id == user_id)
+    )'''
+
+        target = _locate(tree, is_base_query)
+        if target is None:
+            print("⚠️ Conversation service base query pattern not found")
+        elif "loader_options" in _segment(content, target) or "joinedload" in _segment(content, target) \
+                or "project_conversations" in _segment(content, target):
+            print("⚠️ Conversation service loading already enhanced")
+        elif use_dto:
+            patches.append((target, new_loading_dto, "✅ Rewrote conversation list query as a column DTO select"))
+        else:
+            patches.append((target, new_loading, "✅ Enhanced conversation service relationship loading (joinedload)"))
+
+        # Patch 2: joinedload against a collection requires de-duplication at the call site
+        def is_result_call_site(node):
+            return (
+                isinstance(node, ast.Assign)
+                and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and node.targets[0].id == "conversations"
+                and isinstance(node.value, ast.Call)
+                and isinstance(node.value.func, ast.Attribute)
+                and node.value.func.attr == "all"
+            )
+
+        new_result = '''\
+    conversations = result.unique().scalars().all()  # unique() required with joinedload on collections'''
+
+        new_result_dto = '''\
+    conversations = [dict(row) for row in result.mappings().all()]  # plain dicts, ready to serialize'''
+
+        target = _locate(tree, is_result_call_site)
+        if target is None:
+            print("⚠️ Result call site pattern not found")
+        elif "unique" in _segment(content, target) or "mappings" in _segment(content, target):
+            print("⚠️ Result call site already updated")
+        elif use_dto:
+            patches.append((target, new_result_dto, "✅ Result call site returns plain dict rows"))
+        else:
+            patches.append((target, new_result, "✅ Added result.unique() for joinedload de-duplication"))
+
+        # Patch 3: the per-conversation refresh/force-loading pass. ORM mode
+        # enhances it; DTO mode removes it outright, because the rows are now
+        # plain dicts with nothing to refresh
+        def is_refresh_call(node):
+            # The service has half a dozen `await db.refresh(...)` calls; the
+            # list-view refresh is the only one passing exactly these
+            # attribute_names, so match on them instead of the call shape alone
+            if not (
+                isinstance(node, ast.Expr)
+                and isinstance(node.value, ast.Await)
+                and isinstance(node.value.value, ast.Call)
+                and isinstance(node.value.value.func, ast.Attribute)
+                and node.value.value.func.attr == "refresh"
+            ):
+                return False
+            for keyword in node.value.value.keywords:
+                if keyword.arg == "attribute_names" and isinstance(keyword.value, ast.List):
+                    names = [elt.value for elt in keyword.value.elts if isinstance(elt, ast.Constant)]
+                    return names == ['projects', 'assistant', 'user']
+            return False
+
+        new_refresh = '''\
+    # 🔧 CRITICAL FIX: Force refresh and validate project relationships
+    await db.refresh(conversation, attribute_names=['projects', 'assistant', 'user'])
+
+    # The base query eager-loads projects; check it once instead of touching every
+    # attribute (the old touch loop re-loaded the load_only-deferred columns)
+    if 'projects' in inspect(conversation).unloaded:
+        logger.error(f"❌ projects still unloaded on conversation {conversation.id} after refresh")
+    # Instance dict access skips the descriptor machinery (selectinload already populated it)
+    projects_count = len(conversation.__dict__.get('projects', ()))
+    logger.info(f"🔧 FORCED projects loading for conv {conversation.id}: {projects_count} projects")'''
+
+        def is_force_loading_loop(node):
+            # The `for conversation in conversations:` pass that refreshes and
+            # touches every row - dict rows would crash on the first refresh
+            return (
+                isinstance(node, ast.For)
+                and isinstance(node.target, ast.Name)
+                and node.target.id == "conversation"
+                and isinstance(node.iter, ast.Name)
+                and node.iter.id == "conversations"
+            )
+
+        def is_local_assoc_import(node):
+            # A function-local import makes project_conversations local for the
+            # whole scope, so the injected query (spliced above it) would hit
+            # UnboundLocalError despite the module-level import
+            return (
+                isinstance(node, ast.ImportFrom)
+                and node.module == "models.project"
+                and node.level == 2
+                and node.col_offset > 0
+            )
+
+        def is_force_touch_block(node):
+            # The legacy `if hasattr(conversation, 'projects'):` wrapping the
+            # attribute-touch loop; the later hasattr guard only logs id/name
+            # and contains no loop, so require one
+            return (
+                isinstance(node, ast.If)
+                and isinstance(node.test, ast.Call)
+                and isinstance(node.test.func, ast.Name)
+                and node.test.func.id == "hasattr"
+                and len(node.test.args) == 2
+                and isinstance(node.test.args[1], ast.Constant)
+                and node.test.args[1].value == "projects"
+                and any(isinstance(child, ast.For) for child in ast.walk(node))
+            )
+
+        dto_loop_note = '''\
+    # DTO rows are plain dicts - nothing to refresh or force-load per conversation'''
+
+        if use_dto:
+            target = _locate(tree, is_force_loading_loop)
+            if target is None:
+                if "nothing to refresh or force-load" in content:
+                    print("⚠️ Force-loading loop already removed")
+                else:
+                    print("⚠️ Force-loading loop pattern not found")
+            else:
+                patches.append((target, dto_loop_note, "✅ Removed the per-conversation refresh loop (DTO rows are dicts)"))
+            local_import = _locate(tree, is_local_assoc_import)
+            if local_import is not None:
+                patches.append((local_import, "", "✅ Hoisted the project_conversations import to module scope"))
+        else:
+            refresh = _locate(tree, is_refresh_call)
+            if refresh is None:
+                print("⚠️ Conversation refresh pattern not found")
+            elif "inspect(conversation).unloaded" in content:
+                print("⚠️ Conversation refresh logic already enhanced")
+            else:
+                # get_conversation has a touch block of its own above this one,
+                # so only consider siblings below the matched refresh
+                touch_block = _locate(tree, lambda node: is_force_touch_block(node)
+                                      and node.lineno > refresh.lineno
+                                      and node.col_offset == refresh.col_offset)
+                target = refresh
+                if touch_block is not None:
+                    # Replace the legacy touch loop along with the refresh, not
+                    # just the refresh statement - leaving it would re-touch
+                    # (and re-load) the load_only-deferred project columns
+                    target = _span(refresh, touch_block)
+                patches.append((target, new_refresh, "✅ Enhanced conversation refresh logic with forced project loading"))
+
+        # Splice bottom-up so earlier patches keep valid line numbers
+        for node, replacement, message in sorted(patches, key=lambda p: p[0].lineno, reverse=True):
+            lines = _splice(lines, node, replacement)
+            print(message)
+
+        # Rewrite in place only when a patch landed
+        _write_back(f, content, lines)
+
     return True
 
 def create_debug_endpoint():
@@ -136,41 +406,49 @@ async def debug_project_loading(
     """
     try:
         # Get the first few conversations with enhanced loading
-        from sqlalchemy.orm import selectinload
+        from sqlalchemy.orm import selectinload, load_only, raiseload
         from ..models.project import Project
-        
+
+        # yield_per bounds the IN-list of the secondary selectin query, so the
+        # same code promotes safely to pages much larger than 5
         query = select(Conversation).options(
-            selectinload(Conversation.projects).selectinload(Project.user),
+            selectinload(Conversation.projects).load_only(Project.id, Project.name),
             selectinload(Conversation.assistant),
-            selectinload(Conversation.user)
-        ).where(Conversation.user_id == current_user.id).limit(5)
-        
-        result = await db.execute(query)
-        conversations = result.scalars().all()
-        
+            selectinload(Conversation.user),
+            raiseload("*")  # Any relationship to_dict touches that isn't loaded above raises loudly
+        ).where(Conversation.user_id == current_user.id).limit(5).execution_options(yield_per=5)
+
+        result = await db.stream(query)
+
         debug_info = []
-        for conv in conversations:
-            # Force refresh to ensure relationships are loaded
-            await db.refresh(conv, attribute_names=['projects', 'assistant', 'user'])
-            
-            # Test serialization
-            conv_dict = conv.to_dict()
-            
-            debug_info.append({
-                "conversation_id": conv.id,
-                "title": conv.title,
-                "has_projects_attr": hasattr(conv, 'projects'),
-                "projects_count": len(conv.projects) if hasattr(conv, 'projects') and conv.projects else 0,
-                "projects_list": [{"id": p.id, "name": p.name} for p in conv.projects] if hasattr(conv, 'projects') and conv.projects else [],
-                "serialized_project_id": conv_dict.get('project_id'),
-                "serialized_project": conv_dict.get('project'),
-                "raw_projects": str(conv.projects) if hasattr(conv, 'projects') else "No projects attr"
-            })
-        
+        async for partition in result.scalars().partitions(5):
+            for conv in partition:
+                # Force refresh to ensure relationships are loaded
+                await db.refresh(conv, attribute_names=['projects', 'assistant', 'user'])
+
+                # Test serialization
+                conv_dict = conv.to_dict()
+
+                # One descriptor access instead of four per conversation
+                projects = getattr(conv, 'projects', None)
+                has_projects = projects is not None
+                projects = projects or ()
+
+                debug_info.append({
+                    "conversation_id": conv.id,
+                    "title": conv.title,
+                    "has_projects_attr": has_projects,
+                    "projects_count": len(projects),
+                    "projects_list": [{"id": p.id, "name": p.name} for p in projects],
+                    "serialized_project_id": conv_dict.get('project_id'),
+                    "serialized_project": conv_dict.get('project'),
+                    "raw_projects": str(projects)
+                })
+
         return {
             "status": "debug_complete",
             "user_id": current_user.id,
-            "conversations_tested": len(conversations),
+            "conversations_tested": len(debug_info),
             "debug_data": debug_info
         }
         
@@ -201,9 +479,12 @@ def main():
     print("APPLYING FIXES...")
     print("="*70)
     
-    # Apply fixes
-    success1 = apply_conversation_model_fix()
-    success2 = apply_conversation_service_fix()
+    # Apply fixes - the two patches touch different files, so run them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        success1, success2 = executor.map(
+            lambda fix: fix(),
+            [apply_conversation_model_fix, apply_conversation_service_fix]
+        )
     debug_endpoint = create_debug_endpoint()
     
     print("\n" + "="*70)
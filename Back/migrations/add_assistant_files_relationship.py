@@ -17,6 +17,38 @@ from datetime import datetime
 
 from app.core.config import settings
 
+# Full upgrade DDL kept together so the table and its indexes are created
+# in one pass over a single connection and transaction.
+UPGRADE_DDL = """
+    CREATE TABLE IF NOT EXISTS assistant_files (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        assistant_id INTEGER NOT NULL,
+        file_id INTEGER NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        created_by INTEGER NOT NULL,
+
+        -- Foreign key constraints
+        FOREIGN KEY (assistant_id) REFERENCES assistants(id)
+            ON DELETE CASCADE,
+        FOREIGN KEY (file_id) REFERENCES file_uploads(id)
+            ON DELETE CASCADE,
+        FOREIGN KEY (created_by) REFERENCES users(id)
+            ON DELETE CASCADE,
+
+        -- Ensure no duplicate file attachments per assistant
+        UNIQUE (assistant_id, file_id)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_assistant_files_assistant_id
+    ON assistant_files(assistant_id);
+
+    CREATE INDEX IF NOT EXISTS idx_assistant_files_file_id
+    ON assistant_files(file_id);
+
+    CREATE INDEX IF NOT EXISTS idx_assistant_files_created_at
+    ON assistant_files(created_at DESC);
+"""
+
 async def upgrade_database():
     """
     Add assistant_files relationship table.
@@ -29,44 +61,13 @@ async def upgrade_database():
     
     try:
         async with engine.begin() as conn:
-            # Create the assistant_files relationship table
-            await conn.execute(text("""
-                CREATE TABLE IF NOT EXISTS assistant_files (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    assistant_id INTEGER NOT NULL,
-                    file_id INTEGER NOT NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    created_by INTEGER NOT NULL,
-                    
-                    -- Foreign key constraints
-                    FOREIGN KEY (assistant_id) REFERENCES assistants(id) 
-                        ON DELETE CASCADE,
-                    FOREIGN KEY (file_id) REFERENCES file_uploads(id) 
-                        ON DELETE CASCADE,
-                    FOREIGN KEY (created_by) REFERENCES users(id) 
-                        ON DELETE CASCADE,
-                    
-                    -- Ensure no duplicate file attachments per assistant
-                    UNIQUE (assistant_id, file_id)
-                );
-            """))
-            
-            # Create indexes for performance
-            await conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_assistant_files_assistant_id 
-                ON assistant_files(assistant_id);
-            """))
-            
-            await conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_assistant_files_file_id 
-                ON assistant_files(file_id);
-            """))
-            
-            await conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_assistant_files_created_at 
-                ON assistant_files(created_at DESC);
-            """))
-            
+            # Drivers accept one statement per execute() (and the aiosqlite
+            # adapter exposes no executescript), so run the script
+            # statement-by-statement on the one connection/transaction
+            for statement in UPGRADE_DDL.split(";"):
+                if statement.strip():
+                    await conn.exec_driver_sql(statement)
+
             print("✅ Successfully created assistant_files table and indexes")
             
     except Exception as e:
@@ -95,27 +96,33 @@ async def downgrade_database():
     finally:
         await engine.dispose()
 
+# O(1) command dispatch - keeps the migration coroutines free of CLI concerns
+HANDLERS = {
+    "upgrade": upgrade_database,
+    "downgrade": downgrade_database,
+}
+
 if __name__ == "__main__":
     import sys
-    
+
     if len(sys.argv) < 2:
         print("Usage: python add_assistant_files_relationship.py [upgrade|downgrade]")
         sys.exit(1)
-    
+
     command = sys.argv[1].lower()
-    
-    if command == "upgrade":
-        print("🔄 Upgrading database: Adding assistant_files table...")
-        asyncio.run(upgrade_database())
-        print("✅ Migration completed successfully!")
-    elif command == "downgrade":
-        print("🔄 Downgrading database: Removing assistant_files table...")
-        confirmation = input("⚠️  This will permanently delete all assistant-file relationships. Continue? (y/N): ")
-        if confirmation.lower() == 'y':
-            asyncio.run(downgrade_database())
-            print("✅ Downgrade completed!")
-        else:
-            print("❌ Migration cancelled")
-    else:
+    handler = HANDLERS.get(command)
+
+    if handler is None:
         print("❌ Invalid command. Use 'upgrade' or 'downgrade'")
         sys.exit(1)
+
+    # Confirm destructive commands synchronously, before any event loop exists
+    if handler is downgrade_database:
+        confirmation = input("⚠️  This will permanently delete all assistant-file relationships. Continue? (y/N): ")
+        if confirmation.lower() != 'y':
+            print("❌ Migration cancelled")
+            sys.exit(0)
+
+    print(f"🔄 Running database {command}: assistant_files table...")
+    asyncio.run(handler())
+    print(f"✅ Migration {command} completed successfully!")
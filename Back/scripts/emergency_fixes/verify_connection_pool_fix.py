@@ -16,13 +16,26 @@ Usage:
 import sys
 import os
 import asyncio
-import requests
+import functools
+import httpx
+import socket
 import time
 from datetime import datetime
 
 # Add the parent directory to Python path so we can import our modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+
+@functools.lru_cache(maxsize=1)
+def get_sync_engine():
+    """Build the sync engine exactly once per script run.
+
+    Engine construction opens TCP + TLS to the database; every check that
+    needs the engine shares this cached instance instead of rebuilding the pool.
+    """
+    from app.core.database import create_sync_engine_instance
+    return create_sync_engine_instance()
+
 def print_status(message: str, status: str = "INFO"):
     """Print formatted status message."""
     timestamp = datetime.now().strftime("%H:%M:%S")
@@ -34,10 +47,8 @@ def check_local_database_config():
     print_status("Checking local database configuration...")
     
     try:
-        from app.core.database import get_connection_pool_status, create_sync_engine_instance
-        
-        # Create engine to trigger configuration
-        engine = create_sync_engine_instance()
+        # Cached engine - built once per run, shared across checks
+        engine = get_sync_engine()
         
         # Check pool configuration
         if hasattr(engine, 'pool'):
@@ -99,7 +110,20 @@ def check_pool_status_monitoring():
         print_status(f"❌ Pool status monitoring failed: {e}", "ERROR")
         return False
 
-def test_admin_endpoint_response():
+def _port_listening(host: str, port: int, timeout: float = 0.2) -> bool:
+    """Cheap TCP probe - refused connections return in under a millisecond."""
+    with socket.socket() as sock:
+        sock.settimeout(timeout)
+        return sock.connect_ex((host, port)) == 0
+
+async def _timed_get(client: "httpx.AsyncClient", url: str):
+    """GET a URL and return (response, elapsed_ms)."""
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    response = await client.get(url)
+    return response, (loop.time() - start_time) * 1000
+
+async def test_admin_endpoint_response():
     """Test that admin endpoints are responding quickly."""
     print_status("Testing admin endpoint response time...")
     
@@ -111,21 +135,32 @@ def test_admin_endpoint_response():
             "http://localhost:8000/docs",   # FastAPI docs
         ]
         
-        for url in test_urls:
-            try:
-                start_time = time.time()
-                response = requests.get(url, timeout=10)
-                response_time = (time.time() - start_time) * 1000
-                
+        # Probe the port first: when nothing is listening (the common case
+        # for local verification) this avoids waiting out HTTP timeouts
+        if not await asyncio.to_thread(_port_listening, "localhost", 8000):
+            for url in test_urls:
+                print_status(f"ℹ️ {url} not available (server not running locally)", "INFO")
+            return True
+        
+        # The URLs are independent - fire the requests concurrently so their
+        # latencies (and worst-case timeouts) overlap instead of stacking
+        async with httpx.AsyncClient(timeout=10) as client:
+            results = await asyncio.gather(
+                *(_timed_get(client, url) for url in test_urls),
+                return_exceptions=True
+            )
+        
+        for url, result in zip(test_urls, results):
+            if isinstance(result, httpx.ConnectError):
+                print_status(f"ℹ️ {url} not available (server not running locally)", "INFO")
+            elif isinstance(result, Exception):
+                print_status(f"❌ {url} error: {result}", "ERROR")
+            else:
+                response, response_time = result
                 if response_time < 5000:  # Less than 5 seconds
                     print_status(f"✅ {url} responded in {response_time:.1f}ms", "SUCCESS")
                 else:
                     print_status(f"⚠️ {url} slow response: {response_time:.1f}ms", "WARNING")
-                    
-            except requests.exceptions.ConnectionError:
-                print_status(f"ℹ️ {url} not available (server not running locally)", "INFO")
-            except Exception as e:
-                print_status(f"❌ {url} error: {e}", "ERROR")
                 
         return True
         
@@ -154,30 +189,39 @@ def check_environment_variables():
     
     return True
 
-def main():
+async def main():
     """Run all verification checks."""
     print_status("🔥 EMERGENCY FIX VERIFICATION STARTING", "INFO")
     print_status("=" * 60, "INFO")
     
-    checks = [
-        ("Environment Variables", check_environment_variables),
-        ("Local Database Config", check_local_database_config),
-        ("Pool Status Monitoring", check_pool_status_monitoring),
-        ("Admin Endpoint Response", test_admin_endpoint_response),
+    check_names = [
+        "Environment Variables",
+        "Local Database Config",
+        "Pool Status Monitoring",
+        "Admin Endpoint Response",
     ]
     
+    # The checks are independent, so overlap them: sync checks hop to
+    # threads while the HTTP check awaits - wall-clock becomes the max of
+    # the per-check times instead of the sum (the endpoint check alone can
+    # wait many seconds on connection timeouts)
+    results = await asyncio.gather(
+        asyncio.to_thread(check_environment_variables),
+        asyncio.to_thread(check_local_database_config),
+        asyncio.to_thread(check_pool_status_monitoring),
+        test_admin_endpoint_response(),
+        return_exceptions=True,
+    )
+    
     passed_checks = 0
-    total_checks = len(checks)
+    total_checks = len(check_names)
     
-    for check_name, check_function in checks:
-        print_status(f"Running check: {check_name}")
-        try:
-            if check_function():
-                passed_checks += 1
-            print_status("-" * 40)
-        except Exception as e:
-            print_status(f"❌ Check '{check_name}' failed with exception: {e}", "ERROR")
-            print_status("-" * 40)
+    for check_name, result in zip(check_names, results):
+        if isinstance(result, Exception):
+            print_status(f"❌ Check '{check_name}' failed with exception: {result}", "ERROR")
+        elif result:
+            passed_checks += 1
+        print_status("-" * 40)
     
     print_status("=" * 60)
     print_status(f"VERIFICATION COMPLETE: {passed_checks}/{total_checks} checks passed")
@@ -193,5 +237,5 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    exit_code = main()
+    exit_code = asyncio.run(main())
     sys.exit(exit_code)
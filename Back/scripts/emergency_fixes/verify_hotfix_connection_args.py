@@ -14,27 +14,50 @@ Usage:
 
 import sys
 import os
+import functools
+import re
 from datetime import datetime
+from pathlib import Path
 
 # Add the parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
+
+@functools.lru_cache(maxsize=1)
+def get_sync_engine():
+    """Build the sync engine exactly once per script run."""
+    from app.core.database import create_sync_engine_instance
+    return create_sync_engine_instance()
+
+
+@functools.lru_cache(maxsize=1)
+def get_async_engine():
+    """Build the async engine exactly once per script run."""
+    from app.core.database import create_async_engine_instance
+    return create_async_engine_instance()
+
 def print_status(message: str, status: str = "INFO"):
     """Print formatted status message."""
     timestamp = datetime.now().strftime("%H:%M:%S")
     status_emoji = {"INFO": "ℹ️", "SUCCESS": "✅", "ERROR": "❌", "WARNING": "⚠️", "HOTFIX": "🚑"}
     print(f"{status_emoji.get(status, '📝')} [{timestamp}] {message}")
 
+# Resolved once at import - both code checks read this file
+DATABASE_PY = Path(__file__).resolve().parents[2] / "app" / "core" / "database.py"
+
+# Connection arguments of interest, matched in one pass over database.py
+INVALID_ARGS = {"connect_timeout", "command_timeout", "server_settings"}
+VALID_ARGS = {"sslmode", "application_name"}
+ARG_PATTERN = re.compile(r'"(%s)"' % "|".join(sorted(INVALID_ARGS | VALID_ARGS)))
+
 def check_connection_args_fixed():
     """Verify that invalid connection arguments have been removed."""
     print_status("Checking for invalid PostgreSQL connection arguments...", "HOTFIX")
     
     try:
-        from app.core.database import create_sync_engine_instance, create_async_engine_instance
-        
-        # Check sync engine
-        sync_engine = create_sync_engine_instance()
-        async_engine = create_async_engine_instance()
+        # Cached engines - each is built at most once per run
+        sync_engine = get_sync_engine()
+        async_engine = get_async_engine()
         
         print_status("✅ Database engines created successfully (no invalid args)", "SUCCESS")
         
@@ -61,41 +84,27 @@ def check_connection_args_fixed():
         print_status(f"❌ Database engine creation failed: {e}", "ERROR")
         return False
 
-def check_for_invalid_args_in_code():
-    """Check database.py file for presence of invalid connection arguments."""
+def read_database_py() -> str:
+    """Read app/core/database.py once; both code checks share the content."""
+    return DATABASE_PY.read_text()
+
+def check_for_invalid_args_in_code(content: str):
+    """Check database.py content for presence of invalid connection arguments."""
     print_status("Scanning code for invalid connection arguments...", "HOTFIX")
     
     try:
-        database_file = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            "app", "core", "database.py"
-        )
-        
-        with open(database_file, 'r') as f:
-            content = f.read()
-        
-        # Check for invalid arguments
-        invalid_args = ["connect_timeout", "command_timeout", "server_settings"]
-        found_invalid = []
-        
-        for arg in invalid_args:
-            if f'"{arg}"' in content:
-                found_invalid.append(arg)
+        # One compiled alternation finds every arg of interest in a single scan
+        # instead of five separate substring passes over the file
+        found = set(ARG_PATTERN.findall(content))
+        found_invalid = sorted(found & INVALID_ARGS)
+        found_valid = sorted(found & VALID_ARGS)
         
         if found_invalid:
             print_status(f"❌ Found invalid args in code: {found_invalid}", "ERROR")
             return False
         else:
             print_status("✅ No invalid connection arguments found in code", "SUCCESS")
-            
-        # Check for valid arguments
-        valid_args = ["sslmode", "application_name"]
-        found_valid = []
         
-        for arg in valid_args:
-            if f'"{arg}"' in content:
-                found_valid.append(arg)
-                
         if found_valid:
             print_status(f"✅ Found valid PostgreSQL args: {found_valid}", "SUCCESS")
         
@@ -105,19 +114,11 @@ def check_for_invalid_args_in_code():
         print_status(f"❌ Code scanning failed: {e}", "ERROR")
         return False
 
-def check_pool_settings_preserved():
+def check_pool_settings_preserved(content: str):
     """Verify that pool settings improvements are preserved."""
     print_status("Verifying pool settings are preserved...", "HOTFIX")
     
     try:
-        database_file = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            "app", "core", "database.py"
-        )
-        
-        with open(database_file, 'r') as f:
-            content = f.read()
-        
         # Check for expected pool settings
         expected_settings = [
             "pool_size=30",
@@ -150,9 +151,16 @@ def main():
     print_status("🚑 HOTFIX VERIFICATION: PostgreSQL Connection Arguments", "HOTFIX")
     print_status("=" * 65, "INFO")
     
+    # Read database.py once and hand the same content to both code checks
+    try:
+        database_py = read_database_py()
+    except OSError as e:
+        print_status(f"❌ Could not read database.py: {e}", "ERROR")
+        return 1
+
     checks = [
-        ("Remove Invalid Connection Args", check_for_invalid_args_in_code),
-        ("Preserve Pool Settings", check_pool_settings_preserved),
+        ("Remove Invalid Connection Args", lambda: check_for_invalid_args_in_code(database_py)),
+        ("Preserve Pool Settings", lambda: check_pool_settings_preserved(database_py)),
         ("Database Engine Creation", check_connection_args_fixed),
     ]
     
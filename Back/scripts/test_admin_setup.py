@@ -2,50 +2,35 @@
 """
 Test script to verify admin setup dependencies
 """
+import importlib
 import sys
 from pathlib import Path
 
 # Add the parent directory to Python path
 sys.path.append(str(Path(__file__).parent.parent))
 
+# Every module the admin setup script depends on, with the names it uses
+REQUIRED_IMPORTS = [
+    ("app.core.database", ["async_engine", "AsyncSessionLocal", "Base"], "Database core"),
+    ("app.models.user", ["User"], "User model"),
+    ("app.models.role", ["Role"], "Role model"),
+    ("app.models.department", ["Department"], "Department model"),
+    ("app.core.security", ["get_password_hash"], "Security"),
+]
+
 def test_imports():
     """Test that all required imports work."""
     print("🧪 Testing imports...")
     
-    try:
-        from app.core.database import async_engine, AsyncSessionLocal, Base
-        print("   ✅ Database core imports OK")
-    except Exception as e:
-        print(f"   ❌ Database imports failed: {e}")
-        return False
-    
-    try:
-        from app.models.user import User
-        print("   ✅ User model import OK")
-    except Exception as e:
-        print(f"   ❌ User model import failed: {e}")
-        return False
-    
-    try:
-        from app.models.role import Role
-        print("   ✅ Role model import OK")
-    except Exception as e:
-        print(f"   ❌ Role model import failed: {e}")
-        return False
-    
-    try:
-        from app.models.department import Department
-        print("   ✅ Department model import OK")
-    except Exception as e:
-        print(f"   ❌ Department model import failed: {e}")
-        return False
-    
-    try:
-        from app.core.security import get_password_hash
-        print("   ✅ Security imports OK")
-    except Exception as e:
-        print(f"   ❌ Security imports failed: {e}")
-        return False
+    for module_path, names, label in REQUIRED_IMPORTS:
+        try:
+            module = importlib.import_module(module_path)
+            for name in names:
+                getattr(module, name)
+            print(f"   ✅ {label} imports OK")
+        except Exception as e:
+            print(f"   ❌ {label} imports failed: {e}")
+            return False
     
     print("   ✅ All imports successful!")
     return True
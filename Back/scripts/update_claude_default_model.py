@@ -13,6 +13,7 @@ Usage:
 
 import sys
 import asyncio
+import traceback
 from pathlib import Path
 
 # Add the parent directory to Python path
@@ -32,8 +33,7 @@ async def update_claude_default_model():
         # Import database components
         from app.core.database import get_async_session_factory
         from app.models.llm_config import LLMConfiguration, LLMProvider
-        from sqlalchemy import select
-        from datetime import datetime
+        from sqlalchemy import select, update
         
         # Get async session
         session_factory = get_async_session_factory()
@@ -55,29 +55,22 @@ async def update_claude_default_model():
             
             print(f"✅ Found {len(claude_configs)} Claude configuration(s):")
             
-            updated_count = 0
-            
             for config in claude_configs:
                 print(f"\n📋 Configuration: {config.name} (ID: {config.id})")
                 print(f"   Current default model: {config.default_model}")
                 print(f"   Provider: {config.provider.value}")
                 print(f"   Active: {config.is_active}")
                 
-                # Check if this config needs updating
                 if config.default_model == "claude-opus-4-0":
-                    print("   🔄 Updating default model to claude-3-5-haiku-latest...")
-                    
-                    # Update the default model
-                    config.default_model = "claude-3-5-haiku-latest"
-                    config.updated_at = datetime.utcnow()
+                    print("   🔄 Will update default model to claude-3-5-haiku-latest...")
                     
-                    # Ensure the new model is in the available models list
+                    # Ensure the new model is in the available models list.
+                    # Reassign rather than append: in-place mutation of a
+                    # plain JSON column is invisible to change tracking and
+                    # the UPDATE would be silently dropped at flush
                     if config.available_models and "claude-3-5-haiku-latest" not in config.available_models:
                         print("   📝 Adding claude-3-5-haiku-latest to available models list...")
-                        config.available_models.append("claude-3-5-haiku-latest")
-                    
-                    updated_count += 1
-                    print("   ✅ Updated!")
+                        config.available_models = config.available_models + ["claude-3-5-haiku-latest"]
                     
                 elif config.default_model == "claude-3-5-haiku-latest":
                     print("   ✅ Already set to claude-3-5-haiku-latest - no change needed")
@@ -85,6 +78,21 @@ async def update_claude_default_model():
                 else:
                     print(f"   ℹ️  Using different model ({config.default_model}) - skipping")
             
+            # One UPDATE for every matching row instead of a flush with one
+            # statement per mutated configuration; updated_at is stamped by
+            # the column's onupdate=func.now() atomically with the UPDATE
+            update_stmt = (
+                update(LLMConfiguration)
+                .where(
+                    LLMConfiguration.provider == LLMProvider.ANTHROPIC,
+                    LLMConfiguration.default_model == "claude-opus-4-0",
+                )
+                .values(default_model="claude-3-5-haiku-latest")
+                .returning(LLMConfiguration.id)
+            )
+            updated_ids = (await session.execute(update_stmt)).scalars().all()
+            updated_count = len(updated_ids)
+            
             if updated_count > 0:
                 print(f"\n💾 Committing {updated_count} configuration update(s)...")
                 await session.commit()
@@ -116,7 +124,6 @@ async def update_claude_default_model():
         print("  • DATABASE_URL is not set correctly")
         print("  • Database connection failed")
         print("\nError details:")
-        import traceback
         print(traceback.format_exc())
         sys.exit(1)
 
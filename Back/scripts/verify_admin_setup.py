@@ -18,6 +18,7 @@ from app.models.user import User
 from app.models.role import Role
 from app.models.department import Department
 from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload
 
 async def verify_admin_setup():
     """Verify that admin setup completed successfully."""
@@ -34,11 +35,14 @@ async def verify_admin_setup():
             
             # Check roles
             print("\n2. Checking roles...")
-            roles = await session.execute(select(Role))
-            role_list = list(roles.scalars())
+            # Stream instead of materializing - keeps peak memory bounded by
+            # yield_per even if the table grows beyond the seeded rows
+            roles = await session.stream_scalars(
+                select(Role).execution_options(yield_per=100)
+            )
+            existing_roles = [role.name async for role in roles]
             
             required_roles = ["admin", "manager", "user"]
-            existing_roles = [role.name for role in role_list]
             
             for required_role in required_roles:
                 if required_role in existing_roles:
@@ -48,20 +52,27 @@ async def verify_admin_setup():
             
             # Check departments
             print("\n3. Checking departments...")
-            departments = await session.execute(select(Department))
-            dept_list = list(departments.scalars())
+            departments = await session.stream_scalars(
+                select(Department).execution_options(yield_per=100)
+            )
+            dept_count = 0
+            async for dept in departments:
+                print(f"      - {dept.name} ({dept.code})")
+                dept_count += 1
             
-            if dept_list:
-                print(f"   ✅ Found {len(dept_list)} department(s)")
-                for dept in dept_list:
-                    print(f"      - {dept.name} ({dept.code})")
+            if dept_count:
+                print(f"   ✅ Found {dept_count} department(s)")
             else:
                 print("   ❌ No departments found")
             
             # Check admin user
             print("\n4. Checking admin user...")
+            # Eager-load role and department up front - touching them lazily
+            # on an AsyncSession would raise MissingGreenlet
             admin_user = await session.execute(
-                select(User).where(User.email == "admin@aidock.dev")
+                select(User)
+                .options(selectinload(User.role), selectinload(User.department))
+                .where(User.email == "admin@aidock.dev")
             )
             admin = admin_user.scalar_one_or_none()
             
@@ -83,16 +94,21 @@ async def verify_admin_setup():
             # Summary
             print("\n" + "=" * 50)
             
-            total_users = await session.scalar(select(func.count(User.id)))
-            total_roles = await session.scalar(select(func.count(Role.id)))
-            total_depts = await session.scalar(select(func.count(Department.id)))
+            # Three scalar subqueries in one SELECT - one round-trip for
+            # all the summary counts instead of three sequential queries
+            counts_stmt = select(
+                select(func.count()).select_from(User).scalar_subquery().label("users"),
+                select(func.count()).select_from(Role).scalar_subquery().label("roles"),
+                select(func.count()).select_from(Department).scalar_subquery().label("departments"),
+            )
+            total_users, total_roles, total_depts = (await session.execute(counts_stmt)).one()
             
             print(f"📊 SUMMARY")
             print(f"   Users: {total_users}")
             print(f"   Roles: {total_roles}")
             print(f"   Departments: {total_depts}")
             
-            if admin and len(role_list) >= 3 and len(dept_list) >= 1:
+            if admin and len(existing_roles) >= 3 and dept_count >= 1:
                 print("\n🎉 Admin setup verification PASSED!")
                 print("\nYou can now:")
                 print("  1. Start the backend: uvicorn app.main:app --reload")
@@ -4,53 +4,69 @@ Simple health check script for Railway debugging.
 This bypasses all the app dependencies to test basic Python execution.
 """
 
+import importlib
 import os
 import sys
 from datetime import datetime
 
+def _try_import(name):
+    """Import a module once at load time, returning (module, error)."""
+    try:
+        return importlib.import_module(name), None
+    except Exception as e:  # noqa: BLE001 - report whatever broke the import
+        return None, e
+
+# Resolve the critical imports once at module load instead of on every
+# probe - a healthy server pays the sys.path stat walk a single time
+_fastapi, _fastapi_error = _try_import("fastapi")
+_uvicorn, _uvicorn_error = _try_import("uvicorn")
+_sqlalchemy, _sqlalchemy_error = _try_import("sqlalchemy")
+
+# Variables the health check reports on; the sensitive ones are masked
+ENV_VARS = [
+    "PORT", "DATABASE_URL", "SECRET_KEY", "ENVIRONMENT", 
+    "RAILWAY_ENVIRONMENT", "RAILWAY_PROJECT_ID"
+]
+SENSITIVE_VARS = {"SECRET_KEY", "DATABASE_URL"}
+
 def main():
     print("🔍 Railway Health Check Debug")
     print(f"📅 Timestamp: {datetime.now()}")
     print(f"🐍 Python Version: {sys.version}")
     print(f"📂 Working Directory: {os.getcwd()}")
     
-    # Check critical environment variables
+    # Check critical environment variables - read the environment once and
+    # reuse the values for every later check in this run
     print("\n🔧 Environment Variables:")
-    env_vars = [
-        "PORT", "DATABASE_URL", "SECRET_KEY", "ENVIRONMENT", 
-        "RAILWAY_ENVIRONMENT", "RAILWAY_PROJECT_ID"
-    ]
+    env = os.environ
+    values = {var: env.get(var) for var in ENV_VARS}
     
-    for var in env_vars:
-        value = os.getenv(var)
-        if var in ["SECRET_KEY", "DATABASE_URL"] and value:
+    for var, value in values.items():
+        if var in SENSITIVE_VARS and value:
             # Hide sensitive values
             print(f"   {var}: {'*' * 20} (SET)")
         else:
             print(f"   {var}: {value or 'NOT SET'}")
     
-    # Test basic imports
+    # Report the imports resolved at module load
     print("\n📦 Testing Critical Imports:")
-    try:
-        import fastapi
-        print(f"   ✅ FastAPI: {fastapi.__version__}")
-    except Exception as e:
-        print(f"   ❌ FastAPI: {e}")
+    if _fastapi is not None:
+        print(f"   ✅ FastAPI: {_fastapi.__version__}")
+    else:
+        print(f"   ❌ FastAPI: {_fastapi_error}")
     
-    try:
-        import uvicorn
+    if _uvicorn is not None:
         print(f"   ✅ Uvicorn: Available")
-    except Exception as e:
-        print(f"   ❌ Uvicorn: {e}")
+    else:
+        print(f"   ❌ Uvicorn: {_uvicorn_error}")
     
-    try:
-        import sqlalchemy
-        print(f"   ✅ SQLAlchemy: {sqlalchemy.__version__}")
-    except Exception as e:
-        print(f"   ❌ SQLAlchemy: {e}")
+    if _sqlalchemy is not None:
+        print(f"   ✅ SQLAlchemy: {_sqlalchemy.__version__}")
+    else:
+        print(f"   ❌ SQLAlchemy: {_sqlalchemy_error}")
     
     # Test database URL format
-    db_url = os.getenv("DATABASE_URL")
+    db_url = values["DATABASE_URL"]
     if db_url:
         print(f"\n🗄️  Database Analysis:")
         if db_url.startswith("postgres://"):
@@ -64,11 +80,11 @@ def main():
             print(f"   ⚠️  Unknown database type: {db_url[:20]}...")
     
     print("\n🎯 Recommendations:")
-    if not os.getenv("PORT"):
+    if not values["PORT"]:
         print("   ❌ PORT not set - Railway should provide this")
-    if not os.getenv("DATABASE_URL"):
+    if not values["DATABASE_URL"]:
         print("   ❌ DATABASE_URL not set - Add PostgreSQL service")
-    if not os.getenv("SECRET_KEY"):
+    if not values["SECRET_KEY"]:
         print("   ❌ SECRET_KEY not set - Add to Railway variables")
     
     print("\n✅ Health check completed")
@@ -3,19 +3,44 @@
 Quick test to verify auth_service imports correctly after fixing session usage.
 """
 
+import importlib.util
 import sys
 import os
 
 # Add the Back directory to the Python path
 sys.path.insert(0, os.path.abspath("."))
 
+from pyc_warmup import warm_bytecode_cache
+
+def lazy_import(name):
+    """Return a lazily-executed module, or None if it cannot be found.
+
+    find_spec gives a fast negative without touching the module body; the
+    LazyLoader defers executing it (and its jwt/passlib/SQLAlchemy imports)
+    until the first attribute access.
+    """
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        return None
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
 def test_auth_service_import():
     """Test that auth_service imports without errors."""
     try:
         print("🔍 Testing auth_service import...")
         
-        # Import the auth service module
-        from app.services.auth_service import authenticate_user
+        # Probe the module lazily - a missing module fails fast, a present
+        # one only executes its body when the attribute is actually read
+        auth_service = lazy_import("app.services.auth_service")
+        if auth_service is None:
+            print("❌ app.services.auth_service not found")
+            return False
+        
+        authenticate_user = getattr(auth_service, "authenticate_user", None)
         
         # Check if authenticate_user is callable
         if authenticate_user is None:
@@ -70,10 +95,13 @@ def test_all_auth_functions():
         print(f"❌ Error importing auth functions: {e}")
         return False
 
-if __name__ == "__main__":
+def main() -> bool:
     print("🚀 AI Dock Auth Service Import Test")
     print("=" * 50)
     
+    # Precompile the app tree so the import tests load cached bytecode
+    warm_bytecode_cache()
+    
     # Test basic import
     test1_passed = test_auth_service_import()
     print()
@@ -93,3 +121,8 @@ if __name__ == "__main__":
     print("1. Deploy this fix to Railway")
     print("2. Test the login endpoint")
     print("3. Check Railway logs for any remaining errors")
+    
+    return test1_passed and test2_passed
+
+if __name__ == "__main__":
+    main()
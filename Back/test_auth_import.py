@@ -4,30 +4,50 @@ Test script to verify that the auth_service.py imports correctly
 and that authenticate_user function is callable.
 """
 
+import importlib.util
 import sys
 import os
 
 # Add the backend directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
+def lazy_import(name):
+    """Return a lazily-executed module, or None if it cannot be found."""
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        return None
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+# Precompile the app tree so the import tests load cached bytecode
+from pyc_warmup import warm_bytecode_cache
+warm_bytecode_cache()
+
 try:
     print("🔍 Testing auth_service imports...")
     
-    # Test importing the auth service module
-    from app.services.auth_service import authenticate_user, AuthenticationError
+    # Probe lazily: a missing module fails fast without executing anything,
+    # and the body (with its jwt/passlib imports) only runs on first access
+    auth_service = lazy_import("app.services.auth_service")
+    if auth_service is None:
+        raise ImportError("app.services.auth_service not found")
+    
+    authenticate_user = auth_service.authenticate_user
+    AuthenticationError = auth_service.AuthenticationError
     
     print("✅ Successfully imported auth_service module")
     print(f"✅ authenticate_user function: {authenticate_user}")
     print(f"✅ authenticate_user is callable: {callable(authenticate_user)}")
     print(f"✅ AuthenticationError class: {AuthenticationError}")
     
-    # Test importing other functions from the module
-    from app.services.auth_service import (
-        logout_user,
-        get_current_user_from_token,
-        create_user_info,
-        create_user_tokens
-    )
+    # The module is executed now - the rest are plain namespace lookups
+    logout_user = auth_service.logout_user
+    get_current_user_from_token = auth_service.get_current_user_from_token
+    create_user_info = auth_service.create_user_info
+    create_user_tokens = auth_service.create_user_tokens
     
     print("✅ Successfully imported all auth service functions")
     print(f"✅ logout_user: {callable(logout_user)}")
@@ -7,6 +7,10 @@ Run this from your /Back directory to test the import chain.
 import sys
 sys.path.append('.')
 
+# Precompile the app tree so the import tests load cached bytecode
+from pyc_warmup import warm_bytecode_cache
+warm_bytecode_cache()
+
 try:
     print("🔍 Testing imports...")
     
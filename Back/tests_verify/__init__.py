@@ -0,0 +1,27 @@
+"""
+Single entry point for the one-off verification scripts.
+
+Usage: cd Back && python -m tests_verify <command>
+
+PEP 562 module __getattr__ keeps every script unloaded until its command is
+actually requested, so running one verifier never pays the import cost of
+the others (the schema/db-heavy scripts in particular).
+"""
+
+import importlib
+
+# Command name -> script module at the Back/ level
+COMMANDS = {
+    "auth_fix": "test_auth_fix",
+    "auth_import": "test_auth_import",
+    "local_fix": "test_local_fix",
+    "fixes": "verify_fixes",
+    "request_prompt": "verify_request_prompt",
+    "health": "simple_health",
+}
+
+
+def __getattr__(name):
+    if name in COMMANDS:
+        return importlib.import_module(COMMANDS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
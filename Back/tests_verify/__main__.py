@@ -0,0 +1,31 @@
+"""Dispatch `python -m tests_verify <command>` to the matching script."""
+
+import asyncio
+import sys
+
+import tests_verify
+
+
+def main() -> int:
+    if len(sys.argv) < 2 or sys.argv[1] not in tests_verify.COMMANDS:
+        commands = ", ".join(sorted(tests_verify.COMMANDS))
+        print(f"Usage: python -m tests_verify [{commands}]")
+        return 1
+
+    # The lazy __getattr__ imports only the requested script
+    module = getattr(tests_verify, sys.argv[1])
+
+    runner = getattr(module, "main", None)
+    if runner is None:
+        # Import-time scripts (auth_import, local_fix) have already run
+        # their checks during the import above
+        return 0
+
+    result = runner()
+    if asyncio.iscoroutine(result):
+        result = asyncio.run(result)
+    return 0 if result in (None, True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,14 +13,49 @@ FIXES APPLIED:
 Usage: python verify_fixes.py
 """
 
+from functools import lru_cache
+from pathlib import Path
+
+# Resolve the checked files relative to this script so the verification
+# works anywhere the repo is checked out, and resolve each path only once
+_BASE = Path(__file__).resolve().parent
+_MODEL_PY = _BASE / "app" / "models" / "conversation.py"
+_SERVICE_PY = _BASE / "app" / "services" / "conversation_service.py"
+
+# Every literal the conversation.py checks look for; one streaming pass
+# collects all of them
+_CONVERSATION_NEEDLES = (
+    b'lazy="selectin"',
+    b'CRITICAL: Conversation',
+    b'projects_list after list()',
+)
+
+def _scan_for(path: Path, needles) -> frozenset:
+    """Stream a file line by line, returning the subset of needles found.
+
+    Keeps resident memory at one line instead of the whole file and stops
+    reading as soon as every needle has been seen.
+    """
+    pending = set(needles)
+    found = set()
+    with open(path, 'rb') as f:
+        for line in f:
+            for needle in tuple(pending):
+                if needle in line:
+                    found.add(needle)
+                    pending.discard(needle)
+            if not pending:
+                break
+    return frozenset(found)
+
+@lru_cache(maxsize=None)
+def _matched_needles(path: Path) -> frozenset:
+    """Collect which conversation.py needles are present in one streamed pass."""
+    return _scan_for(path, _CONVERSATION_NEEDLES)
+
 def verify_conversation_model_fix():
     """Verify the conversation model fix is applied"""
-    model_path = "/Users/blas/Desktop/INRE/INRE-DOCK-2/Back/app/models/conversation.py"
-    
-    with open(model_path, 'r') as f:
-        content = f.read()
-    
-    if 'lazy="selectin"' in content:
+    if b'lazy="selectin"' in _matched_needles(_MODEL_PY):
         print("✅ Conversation model fix APPLIED: lazy='selectin' found")
         return True
     else:
@@ -29,12 +64,7 @@ def verify_conversation_model_fix():
 
 def verify_service_fix():
     """Verify the conversation service fix is applied"""
-    service_path = "/Users/blas/Desktop/INRE/INRE-DOCK-2/Back/app/services/conversation_service.py"
-    
-    with open(service_path, 'r') as f:
-        content = f.read()
-    
-    if 'FORCED projects loading for conv' in content:
+    if _scan_for(_SERVICE_PY, (b'FORCED projects loading for conv',)):
         print("✅ Conversation service fix APPLIED: forced loading found")
         return True
     else:
@@ -43,12 +73,8 @@ def verify_service_fix():
 
 def verify_to_dict_fix():
     """Verify the to_dict method fix is applied"""
-    model_path = "/Users/blas/Desktop/INRE/INRE-DOCK-2/Back/app/models/conversation.py"
-    
-    with open(model_path, 'r') as f:
-        content = f.read()
-    
-    if 'CRITICAL: Conversation' in content and 'projects_list after list()' in content:
+    matched = _matched_needles(_MODEL_PY)
+    if b'CRITICAL: Conversation' in matched and b'projects_list after list()' in matched:
         print("✅ to_dict method fix APPLIED: enhanced debugging found")
         return True
     else: